@@ -1,2 +1,10 @@
-from cathsim.dm.env import Phantom, Guidewire, Tip, Navigate, Scene, make_dm_env
+from cathsim.dm.env import (
+    Phantom,
+    Guidewire,
+    Tip,
+    Navigate,
+    Scene,
+    make_dm_env,
+    BatchNavigate,
+)
 from cathsim.dm import visualization
@@ -1,23 +1,23 @@
 import math
 import random
-from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Union
 
+import dm_env
 import numpy as np
-import trimesh
 from cathsim.dm.components import Guidewire, Phantom, Tip
 from cathsim.dm.fluid import apply_fluid_force
 from cathsim.dm.observables import CameraObservable
-from cathsim.dm.utils import distance, filter_mask, get_env_config
-from cathsim.dm.visualization import (
-    create_camera_matrix,
-    point2pixel,
-)
+from cathsim.dm.utils import filter_mask, get_env_config
+from cathsim.dm.visualization import create_camera_matrix
 from dm_control import composer, mjcf
 from dm_control.composer import variation
 from dm_control.composer.observation import observable
 from dm_control.composer.variation import distributions, noises
 from dm_control.mujoco import engine, wrapper
-from pympler.classtracker import ClassTracker
+
+if TYPE_CHECKING:
+    import trimesh
 
 env_config = get_env_config()
 
@@ -57,29 +57,116 @@ def make_scene(geom_groups: list):
     return scene_option
 
 
+# Geom classes, matching the geom groups used by the scene options below.
+OTHER_GEOM, PHANTOM_GEOM, GUIDEWIRE_GEOM, TIP_GEOM = -1, 0, 1, 2
+
+# Shared between every render that needs them; treat as read-only.
+PHANTOM_SCENE_OPTION = make_scene([0])
+GUIDEWIRE_SCENE_OPTION = make_scene([1, 2])
+
+
 def sample_points(
-    mesh: trimesh.Trimesh, y_bounds: tuple, n_points: int = 10
+    mesh: "trimesh.Trimesh",
+    y_bounds: tuple,
+    n_points: int = 100,
+    rng: np.random.Generator = None,
+    max_tries: int = 100,
 ) -> np.ndarray:
-    """Sample points from a mesh.
+    """Sample a point inside a mesh.
+
+    Candidate points are drawn uniformly from the mesh bounding box, clipped to
+    the y bounds, and rejected if they fall outside the mesh. Clipping the box
+    first means no candidate is wasted on the y filter.
 
     Args:
         mesh (trimesh.Trimesh): A trimesh mesh
         y_bounds (tuple): The bounds of the y axis
-        n_points (int): The number of points to sample ( default : 10 )
+        n_points (int): The number of candidates drawn per try ( default : 100 )
+        rng (np.random.Generator): The random generator to use ( default : None )
+        max_tries (int): The number of tries before giving up ( default : 100 )
 
     Returns:
         np.ndarray: A point sampled from the mesh
+
+    Raises:
+        ValueError: If no point inside the mesh is found within the y bounds
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    low, high = np.array(mesh.bounds, dtype=np.float64)
+    low[1] = max(low[1], y_bounds[0])
+    high[1] = min(high[1], y_bounds[1])
+
+    if low[1] <= high[1]:
+        for _ in range(max_tries):
+            points = rng.uniform(low, high, size=(n_points, 3))
+            valid_points = points[mesh.contains(points)]
+
+            if len(valid_points) > 0:
+                return valid_points[0]
+
+    raise ValueError(
+        f"No point inside the mesh found for y_bounds {tuple(y_bounds)} after "
+        f"{max_tries} tries of {n_points} points"
+    )
+
+
+def compute_reward(
+    achieved_goal: np.ndarray,
+    desired_goal: np.ndarray,
+    delta: float,
+    success_reward: float,
+    dense_reward: bool,
+) -> tuple:
+    """Compute the reward for a single 3D goal.
+
+    Called every step, so it works on Python floats instead of going through
+    several NumPy calls for a scalar result.
+
+    Args:
+        achieved_goal (np.ndarray): The position of the guidewire head
+        desired_goal (np.ndarray): The target position
+        delta (float): Minimum distance threshold for the success reward
+        success_reward (float): Success reward
+        dense_reward (bool): If True, the reward is the negative distance to the target
+
+    Returns:
+        tuple: The reward and whether the target was reached
     """
+    d = math.dist(achieved_goal, desired_goal)
+    if d < delta:
+        return success_reward, True
+    return (-d if dense_reward else -1.0), False
 
-    def is_within_limits(point):
-        return y_bounds[0] < point[1] < y_bounds[1]
 
-    while True:
-        points = trimesh.sample.volume_mesh(mesh, n_points)
-        valid_points = [point for point in points if is_within_limits(point)]
+def filter_contact_forces(
+    positions: np.ndarray,
+    forces: np.ndarray,
+    threshold: float,
+    camera_matrix: np.ndarray = None,
+) -> tuple:
+    """Filter the contact forces by magnitude and project their positions.
 
-        if valid_points:
-            return random.choice(valid_points)
+    Args:
+        positions (np.ndarray): A (K, 3) array with the contact positions
+        forces (np.ndarray): A (K,) array with the normal contact forces
+        threshold (float): Forces with a magnitude up to the threshold are dropped
+        camera_matrix (np.ndarray): A 3x4 camera matrix. If given, the positions are
+            converted to pixels ( default : None )
+
+    Returns:
+        tuple: The kept positions, as (N, 2) pixels or (N, 3) world coordinates,
+            and the kept (N,) forces
+    """
+    keep = np.abs(forces) > threshold
+    positions, forces = positions[keep], forces[keep]
+
+    if camera_matrix is not None:
+        pixels = positions @ camera_matrix[:, :3].T + camera_matrix[:, 3]
+        positions = np.round(pixels[:, :2] / pixels[:, 2:]).astype(np.int32)
+
+    return positions, forces
 
 
 class Scene(composer.Arena):
@@ -221,9 +308,12 @@ class UniformSphere(variation.Variation):
         self._radius = radius
 
     def __call__(self, initial_value=None, current_value=None, random_state=None):
-        theta = 2 * math.pi * random.random()
-        phi = math.acos(2 * random.random() - 1)
-        r = self._radius * (random.random() ** (1 / 3))
+        random_state = random_state or np.random
+        u_theta, u_phi, u_r = random_state.uniform(size=3).tolist()
+
+        theta = 2 * math.pi * u_theta
+        phi = math.acos(2 * u_phi - 1)
+        r = self._radius * (u_r ** (1 / 3))
 
         # Convert spherical to cartesian
         x_pos = r * math.sin(phi) * math.cos(theta)
@@ -252,6 +342,7 @@ class Navigate(composer.Task):
         target_from_sites: If True, the target will be sampled from sites ( default : True )
         random_init_distance: The distance from the center to sample the initial pose ( default : 0.001 )
         target: The target to use. Can be a string or a numpy array ( default : None )
+        seed: Seed for the target sampling generator ( default : None )
     """
 
     def __init__(
@@ -274,6 +365,7 @@ class Navigate(composer.Task):
         target_from_sites: bool = True,
         random_init_distance: float = 0.001,
         target: Union[str, np.ndarray] = None,
+        seed: Optional[int] = None,
     ):
         self.delta = delta
         self.dense_reward = dense_reward
@@ -290,9 +382,16 @@ class Navigate(composer.Task):
         self.target_from_sites = target_from_sites
         self.sampling_bounds = (0.0954, 0.1342)
         self.random_init_distance = random_init_distance
+        self._rng = np.random.default_rng(seed)
 
         self._setup_arena_and_attachments(phantom, guidewire, tip)
 
+        self._site_positions = {
+            name: np.ascontiguousarray(pos, dtype=np.float64)
+            for name, pos in self._phantom.sites.items()
+        }
+        self._site_names = list(self._site_positions)
+
         self._configure_poses_and_variators()
 
         self._setup_observables()
@@ -301,6 +400,15 @@ class Navigate(composer.Task):
 
         self.control_timestep = env_config["num_substeps"] * self.physics_timestep
         self.success = False
+        self._render_cache_physics = None
+        self._render_cache_time = None
+        self._render_cache = {}
+        self._render_buffers = {}
+        self._cameras = {}
+        self._cameras_physics = None
+        self._camera_matrices = {}
+        self._guidewire_geom_ids = np.zeros(0, dtype=np.int32)
+        self._target_mesh = None
         self.camera_matrix = self.get_camera_matrix(
             image_size=self.image_size, camera_name="top_camera"
         )
@@ -313,6 +421,7 @@ class Navigate(composer.Task):
         del self._task_observables
         del self._arena
         del self.camera_matrix
+        self._free_cameras()
 
     def _setup_arena_and_attachments(
         self, phantom: composer.Entity, guidewire: composer.Entity, tip: composer.Entity
@@ -355,36 +464,36 @@ class Navigate(composer.Task):
                 camera_name="top_camera",
                 width=self.image_size,
                 height=self.image_size,
+                renderer=self._render_frame,
             )
             if self.use_side:
-                guidewire_option = make_scene([1, 2])
                 self._task_observables["side"] = CameraObservable(
                     camera_name="side",
                     width=self.image_size,
                     height=self.image_size,
-                    scene_option=guidewire_option,
+                    scene_option=GUIDEWIRE_SCENE_OPTION,
                     segmentation=True,
+                    renderer=self._render_frame,
                 )
 
         if self.use_segment:
-            guidewire_option = make_scene([1, 2])
-
             self._task_observables["guidewire"] = CameraObservable(
                 camera_name="top_camera",
                 height=self.image_size,
                 width=self.image_size,
-                scene_option=guidewire_option,
+                scene_option=GUIDEWIRE_SCENE_OPTION,
                 segmentation=True,
+                renderer=self._render_frame,
             )
 
         if self.use_phantom_segment:
-            phantom_option = make_scene([0])
             self._task_observables["phantom"] = CameraObservable(
                 camera_name="top_camera",
                 height=self.image_size,
                 width=self.image_size,
-                scene_option=phantom_option,
+                scene_option=PHANTOM_SCENE_OPTION,
                 segmentation=True,
+                renderer=self._render_frame,
             )
 
         self._task_observables["joint_pos"] = observable.Generic(
@@ -420,11 +529,11 @@ class Navigate(composer.Task):
     def set_target(self, target) -> None:
         """Set the target position."""
         if isinstance(target, str):
-            sites = self._phantom.sites
-            assert (
-                target in sites
-            ), f"Target site not found. Valid sites are: {sites.keys()}"
-            target = sites[target]
+            if target not in self._site_positions:
+                raise ValueError(
+                    f"Target site not found. Valid sites are: {self._site_names}"
+                )
+            target = self._site_positions[target]
 
         if self.visualize_target:
             if not hasattr(self, "target_site"):
@@ -437,12 +546,33 @@ class Navigate(composer.Task):
             else:
                 self.target_site.pos = target
 
+        if target is not None:
+            # copy so that editing target_pos cannot change the cached sites
+            target = np.array(target, dtype=np.float64)
         self.target_pos = target
 
     def initialize_episode_mjcf(self, random_state):
         """Initialize the episode mjcf."""
         self._mjcf_variator.apply_variations(random_state)
 
+    def after_compile(self, physics, random_state):
+        """Look up the guidewire geoms once the model is compiled."""
+        geom_class = np.full(physics.model.ngeom, OTHER_GEOM, dtype=np.int8)
+        entities = {
+            PHANTOM_GEOM: self._phantom,
+            GUIDEWIRE_GEOM: getattr(self, "_guidewire", None),
+            TIP_GEOM: getattr(self, "_tip", None),
+        }
+        for class_id, entity in entities.items():
+            if entity is None:
+                continue
+            geoms = entity.mjcf_model.find_all("geom", exclude_attachments=True)
+            geom_class[physics.bind(geoms).element_id] = class_id
+
+        self._guidewire_geom_ids = np.flatnonzero(
+            (geom_class == GUIDEWIRE_GEOM) | (geom_class == TIP_GEOM)
+        ).astype(np.int32)
+
     def initialize_episode(self, physics, random_state):
         """Initialize the episode."""
 
@@ -455,23 +585,21 @@ class Navigate(composer.Task):
         self._guidewire.set_pose(physics, position=guidewire_pose)
 
         self.success = False
+        self._render_cache_time = None
         if self.sample_target:
             self.set_target(self.get_random_target(physics))
 
     def get_reward(self, physics):
         """Get the reward from the environment."""
-        self.head_pos = self.get_head_pos(physics)
-
-        d = distance(self.head_pos, self.target_pos)
-        is_successful = d < self.delta
-
-        # Calculate reward based on success and reward type
-        if self.dense_reward:
-            reward = self.success_reward if is_successful else -d
-        else:
-            reward = self.success_reward if is_successful else -1.0
-
-        self.success = is_successful
+        self.head_pos = physics.data.geom_xpos[-1]
+
+        reward, self.success = compute_reward(
+            self.head_pos,
+            self.target_pos,
+            self.delta,
+            self.success_reward,
+            self.dense_reward,
+        )
         return reward
 
     def should_terminate_episode(self, physics):
@@ -480,7 +608,15 @@ class Navigate(composer.Task):
 
     def get_head_pos(self, physics):
         """Get the position of the head of the guidewire."""
-        return physics.named.data.geom_xpos[-1]
+        return physics.data.geom_xpos[-1]
+
+    def get_guidewire_geom_pos(self, physics) -> np.ndarray:
+        """Get the positions of the guidewire geoms.
+
+        Returns:
+            np.ndarray: An (N, 3) array with the position of each guidewire geom
+        """
+        return physics.data.geom_xpos[self._guidewire_geom_ids]
 
     def get_target_pos(self, physics):
         """Get the position of the target."""
@@ -488,12 +624,12 @@ class Navigate(composer.Task):
 
     def get_joint_positions(self, physics):
         """Get the joint positions."""
-        positions = physics.named.data.qpos
+        positions = physics.data.qpos
         return positions
 
     def get_joint_velocities(self, physics):
         """Get the joint velocities."""
-        velocities = physics.named.data.qvel
+        velocities = physics.data.qvel
         return velocities
 
     def get_total_force(self, physics):
@@ -507,7 +643,7 @@ class Navigate(composer.Task):
         physics: engine.Physics,
         threshold: float = 0.001,
         to_pixels: bool = True,
-        image_size: int = 80,
+        image_size: int = None,
     ) -> dict:
         """Get the contact forces for each contact.
 
@@ -518,31 +654,50 @@ class Navigate(composer.Task):
             physics (engine.Physics): A dm_control physics object
             threshold (float): The threshold to filter the forces ( default : 0.01 )
             to_pixels (bool): Convert the forces to pixels ( default : True )
-            image_size (int): The size of the image ( default : 80 )
+            image_size (int): The size of the image ( default : None )
 
         Returns:
-            dict: A dictionary containing the positions and forces
+            dict: A dictionary containing the positions as a (K, 2) array of pixels
+                (or (K, 3) world coordinates) and the forces as a (K,) array
         """
         data = physics.data
-        forces = {"pos": [], "force": []}
-
-        for i in range(data.ncon):
-            if data.contact[i].dist < 0.002:
-                force = data.contact_force(i)[0][0]
-                if abs(force) > threshold:
-                    forces["force"].append(force)
-                    pos = data.contact[i].pos
-                    if to_pixels:
-                        pos = point2pixel(pos, self.camera_matrix)
-                    forces["pos"].append(pos)
+        contacts = data.contact
 
-        return forces
+        # mujoco has no batched contact force, so only query the close contacts
+        contact_ids = np.flatnonzero(contacts.dist < 0.002)
+        forces = np.array([data.contact_force(i)[0][0] for i in contact_ids])
+
+        camera_matrix = None
+        if to_pixels:
+            camera_matrix = self.get_camera_matrix(image_size=image_size)
+
+        positions, forces = filter_contact_forces(
+            contacts.pos[contact_ids], forces, threshold, camera_matrix
+        )
+        return {"pos": positions, "force": forces}
 
     def get_camera_matrix(
         self,
         image_size: Optional[int] = None,
         camera_name: str = "top_camera",
     ) -> np.ndarray:
+        """Get the camera matrix of a scene camera.
+
+        The matrix only depends on the camera placement and the image size, so it
+        is computed once per ``(image_size, camera_name)`` and cached.
+
+        Args:
+            image_size (int): The size of the image ( default : None )
+            camera_name (str): The name of the camera ( default : "top_camera" )
+
+        Returns:
+            np.ndarray: The 3x4 camera matrix
+        """
+        image_size = image_size or self.image_size
+        key = (image_size, camera_name)
+        if key in self._camera_matrices:
+            return self._camera_matrices[key]
+
         cameras = self._arena.mjcf_model.find_all("camera")
         camera = next((cam for cam in cameras if cam.name == camera_name), None)
 
@@ -551,55 +706,182 @@ class Navigate(composer.Task):
 
         assert camera.quat is not None, "Camera quaternion is None"
 
-        image_size = image_size or self.image_size
         camera_matrix = create_camera_matrix(
             image_size=image_size,
             pos=camera.pos,
             quat=camera.quat,
         )
+        self._camera_matrices[key] = camera_matrix
 
         return camera_matrix
 
-    def get_phantom_mask(self, physics, image_size: int = None, camera_id=0):
-        """Get the phantom mask."""
-        scene_option = make_scene([0])
+    def _get_camera(self, physics, height: int, width: int, camera_id=0):
+        """Get a render camera, reusing the one built for a previous step.
+
+        Cameras are cached per ``(height, width, camera_id)`` and rebuilt whenever
+        the physics changes (e.g. when the MJCF model is recompiled).
+
+        Args:
+            physics: A dm_control physics object
+            height (int): The height of the image
+            width (int): The width of the image
+            camera_id: The camera id ( default : 0 )
+
+        Returns:
+            engine.Camera: The cached camera
+        """
+        if physics is not self._cameras_physics:
+            self._free_cameras()
+            self._cameras_physics = physics
+
+        key = (height, width, camera_id)
+        camera = self._cameras.get(key)
+        if camera is None:
+            camera = engine.Camera(
+                physics, height=height, width=width, camera_id=camera_id
+            )
+            self._cameras[key] = camera
+        return camera
+
+    def _free_cameras(self):
+        """Release the scenes held by the cached cameras."""
+        for camera in self._cameras.values():
+            camera._scene.free()
+        self._cameras = {}
+        self._cameras_physics = None
+
+    def _get_render_cache(self, physics) -> dict:
+        """Get the cache of the observable renders made during the current step.
+
+        Observables are all evaluated on the same state, so their renders are kept
+        until ``physics.data.time`` changes or another physics is rendered. Only
+        the observable renderer uses it, the public getters always render fresh.
+        """
+        time = physics.data.time
+        if self._render_cache_physics is not physics or self._render_cache_time != time:
+            self._render_cache = {}
+            self._render_cache_physics = physics
+            self._render_cache_time = time
+        return self._render_cache
+
+    def _render(
+        self,
+        physics,
+        height: int,
+        width: int,
+        camera_id=0,
+        depth: bool = False,
+        scene_option=None,
+        segmentation: bool = False,
+    ) -> np.ndarray:
+        """Render an image through the cached cameras.
+
+        RGB renders are views of the camera buffer and are overwritten by the
+        camera's next render.
+        """
+        if isinstance(camera_id, str):
+            camera_id = physics.model.name2id(camera_id, "camera")
+        camera = self._get_camera(physics, height, width, camera_id)
+        return camera.render(
+            depth=depth, scene_option=scene_option, segmentation=segmentation
+        )
+
+    def _render_frame(
+        self,
+        physics,
+        height: int,
+        width: int,
+        camera_id=0,
+        depth: bool = False,
+        scene_option=None,
+        segmentation: bool = False,
+    ) -> np.ndarray:
+        """Render a frame for the camera observables.
+
+        Takes the same arguments as ``physics.render``. Identical renders within
+        a step (e.g. from several observables) are only drawn once.
+
+        Returns:
+            np.ndarray: The rendered image
+        """
+        if isinstance(camera_id, str):
+            camera_id = physics.model.name2id(camera_id, "camera")
+
+        cache = self._get_render_cache(physics)
+        key = ("frame", height, width, camera_id, depth, id(scene_option), segmentation)
+        if key not in cache:
+            image = self._render(
+                physics, height, width, camera_id, depth, scene_option, segmentation
+            )
+            # RGB renders are views of the camera buffer, overwritten by the next one
+            if not (depth or segmentation):
+                buffer = self._get_render_buffer(key, image.shape, image.dtype)
+                np.copyto(buffer, image)
+                image = buffer
+            cache[key] = image
+        return cache[key]
+
+    def _get_render_buffer(self, key, shape: tuple, dtype) -> np.ndarray:
+        """Get a preallocated output buffer, reused across steps."""
+        buffer = self._render_buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(shape, dtype=dtype)
+            self._render_buffers[key] = buffer
+        return buffer
+
+    def _render_mask(
+        self, physics, name: str, image_size: int = None, camera_id=0
+    ) -> np.ndarray:
+        """Render the phantom or guidewire mask through the cached camera.
+
+        Only the scene option of the requested mask is rendered, so reading both
+        masks costs two passes through the same camera and reading one costs a
+        single pass.
+
+        Args:
+            physics: A dm_control physics object
+            name (str): Either ``"phantom"`` or ``"guidewire"``
+            image_size (int): The size of the image ( default : None )
+            camera_id: The camera to render from ( default : 0 )
+
+        Returns:
+            np.ndarray: The mask
+        """
         if image_size is None:
             image_size = self.image_size
-        image = physics.render(
-            height=image_size,
-            width=image_size,
-            camera_id=camera_id,
-            scene_option=scene_option,
+
+        scene_option = {
+            "phantom": PHANTOM_SCENE_OPTION,
+            "guidewire": GUIDEWIRE_SCENE_OPTION,
+        }[name]
+        image = self._render(
+            physics, image_size, image_size, camera_id, scene_option=scene_option
         )
-        mask = filter_mask(image)
-        return mask
+        return filter_mask(image)
+
+    def get_phantom_mask(self, physics, image_size: int = None, camera_id=0):
+        """Get the phantom mask."""
+        return self._render_mask(physics, "phantom", image_size, camera_id)
 
     def get_guidewire_mask(self, physics, image_size: int = None, camera_id=0):
         """Get the guidewire mask."""
-        scene_option = make_scene([1, 2])
-        if image_size is None:
-            image_size = self.image_size
-        image = physics.render(
-            height=image_size,
-            width=image_size,
-            camera_id=camera_id,
-            scene_option=scene_option,
-        )
-        mask = filter_mask(image)
-        return mask
+        return self._render_mask(physics, "guidewire", image_size, camera_id)
 
     def get_random_target(self, physics):
         """Get a random target based on conditions."""
 
         # If targets are fetched from predefined sites
         if self.target_from_sites:
-            sites = self._phantom.sites
-            site = np.random.choice(list(sites.keys()))
-            return sites[site]
+            site = self._rng.choice(self._site_names)
+            return self._site_positions[site]
+
+        # Else, get targets from a mesh. The mesh never changes, so it is loaded
+        # once and kept together with its acceleration structures.
+        if self._target_mesh is None:
+            import trimesh
 
-        # Else, get targets from a mesh
-        mesh = trimesh.load_mesh(self._phantom.simplified, scale=0.9)
-        return sample_points(mesh, self.sampling_bounds)
+            self._target_mesh = trimesh.load_mesh(self._phantom.simplified, scale=0.9)
+        return sample_points(self._target_mesh, self.sampling_bounds, rng=self._rng)
 
     def before_step(self, physics, action, random_state):
         if self.apply_fluid_force:
@@ -611,12 +893,14 @@ class Navigate(composer.Task):
 def make_dm_env(
     phantom: str = "phantom3",
     target: str = "bca",
+    seed: Optional[int] = None,
     **kwargs,
 ) -> composer.Environment:
     """Makes a dm_control environment given a configuration.
 
     Args:
       phantom: str:  (Default value = "phantom3") The phantom to use
+      seed: int:  (Default value = None) Seed for the environment and the task
       **kwargs: Additional arguments for the environment
 
     Returns:
@@ -632,17 +916,117 @@ def make_dm_env(
         guidewire=guidewire,
         tip=tip,
         target=target,
+        seed=seed,
         **kwargs,
     )
     env = composer.Environment(
         task=task,
-        random_state=random_state,
+        random_state=random_state if seed is None else np.random.RandomState(seed),
         strip_singleton_obs_buffer_dim=True,
     )
 
     return env
 
 
+class BatchNavigate:
+    """Steps several independent navigation environments with a single call.
+
+    Every environment owns its physics, so they are stepped concurrently (MuJoCo
+    releases the GIL while stepping). Rendering contexts cannot move between
+    threads, so each environment is created, stepped and closed on its own
+    worker thread. The time steps are stacked along a leading batch dimension.
+
+    Use it as a context manager, or call ``close`` to release the worker threads.
+    The specs are those of a single environment, without the batch dimension.
+
+    Args:
+        n_envs: The number of environments
+        seed: Seed used to derive a distinct seed for every environment ( default : None )
+        **kwargs: Additional arguments for ``make_dm_env``
+    """
+
+    def __init__(self, n_envs: int, seed: Optional[int] = None, **kwargs):
+        seeds = np.random.SeedSequence(seed).generate_state(n_envs)
+        self._workers = [ThreadPoolExecutor(max_workers=1) for _ in range(n_envs)]
+        self.envs = self._map(lambda s: make_dm_env(seed=int(s), **kwargs), seeds)
+
+    def __len__(self) -> int:
+        return len(self.envs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def action_spec(self):
+        """The action spec of a single environment."""
+        return self.envs[0].action_spec()
+
+    def observation_spec(self):
+        """The observation spec of a single environment."""
+        return self.envs[0].observation_spec()
+
+    def _map(self, fn, *iterables) -> list:
+        """Call ``fn`` for every environment on that environment's worker thread."""
+        futures = [
+            worker.submit(fn, *args)
+            for worker, args in zip(self._workers, zip(*iterables))
+        ]
+        return [future.result() for future in futures]
+
+    def reset(self) -> dm_env.TimeStep:
+        """Reset all the environments."""
+        return self._stack(self._map(lambda env: env.reset(), self.envs))
+
+    def step(self, actions: np.ndarray) -> dm_env.TimeStep:
+        """Step every environment with its action.
+
+        Args:
+            actions (np.ndarray): The actions, one per environment
+
+        Returns:
+            dm_env.TimeStep: The stacked time steps
+        """
+        if len(actions) != len(self.envs):
+            raise ValueError(
+                f"Expected {len(self.envs)} actions, one per environment, "
+                f"got {len(actions)}"
+            )
+        time_steps = self._map(lambda env, action: env.step(action), self.envs, actions)
+        return self._stack(time_steps)
+
+    def close(self):
+        """Close the environments and shut down their worker threads."""
+        self._map(lambda env: env.close(), self.envs)
+        for worker in self._workers:
+            worker.shutdown()
+
+    @staticmethod
+    def _stack(time_steps: list) -> dm_env.TimeStep:
+        """Stack the time steps of the environments into a single one.
+
+        Environments are reset on their own, so a batch can mix first steps (no
+        reward nor discount) with mid-episode ones. Missing rewards are filled
+        with 0.0 and missing discounts with 1.0.
+        """
+        return dm_env.TimeStep(
+            step_type=np.asarray([ts.step_type for ts in time_steps]),
+            reward=np.array(
+                [0.0 if ts.reward is None else ts.reward for ts in time_steps],
+                dtype=np.float64,
+            ),
+            discount=np.array(
+                [1.0 if ts.discount is None else ts.discount for ts in time_steps],
+                dtype=np.float64,
+            ),
+            observation={
+                key: np.stack([ts.observation[key] for ts in time_steps])
+                for key in time_steps[0].observation
+            },
+        )
+
+
 if __name__ == "__main__":
     from pathlib import Path
 
@@ -1,3 +1,5 @@
+import functools
+
 import numpy as np
 from cathsim.dm.utils import get_env_config
 from dm_control import composer
@@ -20,6 +22,7 @@ class CameraObservable(MujocoCamera):
         grayscale=False,
         segmentation=False,
         scene_option=None,
+        renderer=None,
     ):
         """
         Initialize a : class : ` MujocoCamera `.
@@ -34,6 +37,7 @@ class CameraObservable(MujocoCamera):
             grayscale: True if the camera should return a grayscale image ( default False )
             segmentation: True if the camera should return a segmented image ( default False )
             scene_option: set options for the MuJoCo scene.
+            renderer: Callable used instead of physics.render, called with the physics first ( default None )
         """
         super().__init__(camera_name, height, width)
         self._dtype = np.uint8
@@ -41,6 +45,7 @@ class CameraObservable(MujocoCamera):
         self._preprocess = preprocess
         self.scene_option = scene_option
         self.segmentation = segmentation
+        self._renderer = renderer
 
     def _callable(self, physics):
         """
@@ -52,9 +57,12 @@ class CameraObservable(MujocoCamera):
         Returns:
             A callable that renders the image and returns it as a 3D array of shape ( height width depth
         """
+        render = physics.render
+        if self._renderer is not None:
+            render = functools.partial(self._renderer, physics)
 
         def get_image():
-            image = physics.render(
+            image = render(
                 self._height,
                 self._width,
                 self._camera_name,
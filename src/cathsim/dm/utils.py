@@ -60,21 +60,23 @@ def normalize_rgba(rgba: list) -> list:
     return new_rgba
 
 
-def filter_mask(segment_image: np.ndarray):
+def filter_mask(segment_image: np.ndarray, out: np.ndarray = None):
     """
     Convert the segment image to a mask
 
     Args:
       segment_image: np.ndarray: The segment image
+      out: np.ndarray: Optional float64 (height, width) array to write the mask to
 
     Returns:
         np.ndarray: The mask
     """
-    geom_ids = segment_image[:, :, 0]
-    geom_ids = geom_ids.astype(np.float64) + 1
-    geom_ids = geom_ids / geom_ids.max()
-    segment_image = 255 * geom_ids
-    return segment_image
+    if out is None:
+        out = np.empty(segment_image.shape[:2], dtype=np.float64)
+    np.add(segment_image[:, :, 0], 1.0, out=out)
+    out /= out.max()
+    out *= 255
+    return out
 
 
 def distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
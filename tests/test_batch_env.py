@@ -0,0 +1,69 @@
+import dm_env
+import numpy as np
+import pytest
+from cathsim.dm import BatchNavigate
+
+
+@pytest.fixture
+def batch_env():
+    env = BatchNavigate(2, seed=0, phantom="phantom3", target="bca")
+    yield env
+    env.close()
+
+
+def test_batch_step(batch_env):
+    time_step = batch_env.reset()
+    assert np.array_equal(time_step.reward, np.zeros(len(batch_env)))
+    assert np.array_equal(time_step.discount, np.ones(len(batch_env)))
+    for value in time_step.observation.values():
+        assert value.shape[0] == len(batch_env)
+
+    time_step = batch_env.step(np.zeros((len(batch_env), 2)))
+    assert time_step.reward.shape == (len(batch_env),)
+    assert time_step.discount.shape == (len(batch_env),)
+    for key, value in time_step.observation.items():
+        assert value.shape[0] == len(batch_env), key
+
+
+def test_batch_step_wrong_number_of_actions(batch_env):
+    batch_env.reset()
+    with pytest.raises(ValueError):
+        batch_env.step(np.zeros((len(batch_env) - 1, 2)))
+
+
+def test_batch_step_single_env_terminates(batch_env):
+    batch_env.reset()
+    batch_env.step(np.zeros((len(batch_env), 2)))
+
+    # move the first target onto the guidewire head so only that env succeeds
+    first_env = batch_env.envs[0]
+    first_env.task.set_target(first_env.physics.data.geom_xpos[-1].copy())
+    time_step = batch_env.step(np.zeros((len(batch_env), 2)))
+    assert list(time_step.step_type) == [dm_env.StepType.LAST, dm_env.StepType.MID]
+    assert time_step.reward[0] == first_env.task.success_reward
+
+    time_step = batch_env.step(np.zeros((len(batch_env), 2)))
+    assert list(time_step.step_type) == [dm_env.StepType.FIRST, dm_env.StepType.MID]
+    assert time_step.reward.dtype == np.float64
+    assert time_step.reward[0] == 0.0
+    assert time_step.reward[1] < 0
+    assert time_step.discount[0] == 1.0
+
+
+def test_batch_step_with_pixels():
+    with BatchNavigate(
+        4, seed=0, phantom="phantom3", target="bca", use_pixels=True, image_size=80
+    ) as env:
+        time_step = env.reset()
+        for _ in range(3):
+            time_step = env.step(np.zeros((len(env), 2)))
+        assert time_step.observation["pixels"].shape == (len(env), 80, 80, 3)
+        assert env.observation_spec()["pixels"].shape == (80, 80, 3)
+    assert all(worker._shutdown for worker in env._workers)
+
+
+def test_batch_specs(batch_env):
+    assert batch_env.action_spec() == batch_env.envs[0].action_spec()
+    time_step = batch_env.reset()
+    for key, spec in batch_env.observation_spec().items():
+        assert time_step.observation[key].shape == (len(batch_env),) + spec.shape
@@ -1,8 +1,18 @@
 import pytest
 from dm_control import composer
 from dm_control.mujoco import engine
+from dm_control.mujoco.wrapper.mjbindings import enums
 import numpy as np
-from cathsim.dm import Phantom, Guidewire, Tip, Navigate
+from cathsim.dm import Phantom, Guidewire, Tip, Navigate, make_dm_env
+from cathsim.dm.env import (
+    GUIDEWIRE_SCENE_OPTION,
+    PHANTOM_SCENE_OPTION,
+    compute_reward,
+    filter_contact_forces,
+    sample_points,
+)
+from cathsim.dm.observables import CameraObservable
+from cathsim.dm.utils import filter_mask
 from unittest.mock import Mock
 
 
@@ -49,6 +59,102 @@ def test_should_terminate_episode(task):
     assert task.should_terminate_episode(mock_physics) is False
 
 
+def test_get_reward_success_is_bool(task):
+    mock_physics = Mock()
+    mock_physics.data.geom_xpos = np.array([[0.0, 0.0, 0.0], task.target_pos])
+
+    assert task.get_reward(mock_physics) == task.success_reward
+    assert task.success is True
+    assert task.should_terminate_episode(mock_physics) is True
+
+    mock_physics.data.geom_xpos = np.array([task.target_pos + 1.0])
+    assert task.get_reward(mock_physics) < 0
+    assert task.success is False
+
+
+@pytest.mark.parametrize(
+    "head_pos, dense_reward, expected",
+    [
+        ([0.0, 0.0, 0.001], True, (10.0, True)),
+        ([0.0, 0.0, 0.001], False, (10.0, True)),
+        ([0.0, 0.03, 0.04], True, (-0.05, False)),
+        ([0.0, 0.03, 0.04], False, (-1.0, False)),
+    ],
+)
+def test_compute_reward(head_pos, dense_reward, expected):
+    reward, success = compute_reward(
+        np.array(head_pos), np.zeros(3), 0.004, 10.0, dense_reward
+    )
+    assert reward == pytest.approx(expected[0])
+    assert success is expected[1]
+
+
+def test_filter_contact_forces():
+    positions = np.array([[0.0, 0.0, 1.0], [1.0, 2.0, 2.0], [2.0, 2.0, 1.0]])
+    forces = np.array([0.5, -0.0005, -0.2])
+    camera_matrix = np.eye(3, 4)
+
+    kept_positions, kept_forces = filter_contact_forces(positions, forces, 0.001)
+    assert np.array_equal(kept_positions, positions[[0, 2]])
+    assert np.array_equal(kept_forces, forces[[0, 2]])
+
+    pixels, _ = filter_contact_forces(positions, forces, 0.001, camera_matrix)
+    assert pixels.dtype == np.int32
+    assert np.array_equal(pixels, [[0, 0], [2, 2]])
+
+    pixels, kept_forces = filter_contact_forces(
+        np.zeros((0, 3)), np.zeros(0), 0.001, camera_matrix
+    )
+    assert pixels.shape == (0, 2)
+    assert kept_forces.shape == (0,)
+
+
+def test_set_target_unknown_site(task):
+    with pytest.raises(ValueError, match="Target site not found"):
+        task.set_target("not-a-site")
+
+
+def test_set_target_copies_site_position(task):
+    site_pos = task._site_positions["bca"].copy()
+    task.set_target("bca")
+    task.target_pos[:] = 0
+    assert np.array_equal(task._site_positions["bca"], site_pos)
+
+    task.set_target(task.get_random_target(Mock()))
+    task.target_pos[:] = 0
+    for pos in task._site_positions.values():
+        assert pos.any()
+
+
+def test_sample_points():
+    trimesh = pytest.importorskip("trimesh")
+    mesh = trimesh.creation.icosphere(radius=1.0)
+    y_bounds = (0.2, 0.5)
+
+    points = np.array(
+        [sample_points(mesh, y_bounds, rng=np.random.default_rng(i)) for i in range(20)]
+    )
+    assert mesh.contains(points).all()
+    assert ((points[:, 1] >= y_bounds[0]) & (points[:, 1] <= y_bounds[1])).all()
+
+    point = sample_points(mesh, y_bounds, rng=np.random.default_rng(0))
+    assert np.array_equal(point, points[0])
+
+
+@pytest.mark.parametrize("y_bounds", [(2.0, 3.0), (0.5, 0.2), (-0.2, 0.2)])
+def test_sample_points_outside_mesh(y_bounds):
+    trimesh = pytest.importorskip("trimesh")
+    # two boxes with a gap between y = -0.5 and y = 0.5
+    mesh = trimesh.util.concatenate(
+        [
+            trimesh.creation.box(bounds=[[-1, -1, -1], [1, -0.5, 1]]),
+            trimesh.creation.box(bounds=[[-1, 0.5, -1], [1, 1, 1]]),
+        ]
+    )
+    with pytest.raises(ValueError, match="y_bounds"):
+        sample_points(mesh, y_bounds, rng=np.random.default_rng(0))
+
+
 @pytest.mark.parametrize("image_size", [80, 480])
 @pytest.mark.parametrize("camera_name", ["top_camera", "side"])
 def test_camera_matrix(task, image_size, camera_name):
@@ -63,3 +169,113 @@ def test_camera_matrix(task, image_size, camera_name):
     __import__('pprint').pprint(camera.matrix)
     assert np.allclose(task.camera_matrix, camera.matrix), \
         "Camera matrix is not correct"
+
+
+def test_guidewire_geom_ids(task):
+    env = composer.Environment(task)
+    physics = env.physics
+
+    guidewire_ids = task._guidewire_geom_ids
+    assert len(guidewire_ids) > 0
+    assert task.get_guidewire_geom_pos(physics).shape == (len(guidewire_ids), 3)
+
+    segmentation = physics.render(
+        height=64, width=64, segmentation=True, scene_option=GUIDEWIRE_SCENE_OPTION
+    )
+    is_geom = segmentation[..., 1] == enums.mjtObj.mjOBJ_GEOM
+    assert is_geom.any()
+    assert np.isin(segmentation[..., 0][is_geom], guidewire_ids).all()
+
+
+def test_after_compile_without_guidewire():
+    task = Navigate(phantom=Phantom("phantom3.xml"), target="bca")
+    env = composer.Environment(task)
+    assert len(task._guidewire_geom_ids) == 0
+    assert task.get_guidewire_geom_pos(env.physics).shape == (0, 3)
+
+
+@pytest.fixture
+def render_env():
+    env = make_dm_env(
+        phantom="phantom3",
+        use_pixels=True,
+        use_segment=True,
+        use_phantom_segment=True,
+        target="bca",
+        image_size=80,
+    )
+    yield env
+    env.close()
+
+
+def assert_renders_match(env, time_step):
+    physics, task = env.physics, env.task
+    references = {
+        "pixels": CameraObservable("top_camera"),
+        "guidewire": CameraObservable(
+            "top_camera", scene_option=GUIDEWIRE_SCENE_OPTION, segmentation=True
+        ),
+        "phantom": CameraObservable(
+            "top_camera", scene_option=PHANTOM_SCENE_OPTION, segmentation=True
+        ),
+    }
+    for name, reference in references.items():
+        expected = reference.observation_callable(physics)()
+        assert np.array_equal(time_step.observation[name], expected), name
+
+    masks = {
+        "guidewire": task.get_guidewire_mask(physics),
+        "phantom": task.get_phantom_mask(physics),
+    }
+    for name, scene_option in (
+        ("guidewire", GUIDEWIRE_SCENE_OPTION),
+        ("phantom", PHANTOM_SCENE_OPTION),
+    ):
+        image = physics.render(80, 80, camera_id=0, scene_option=scene_option)
+        assert np.array_equal(masks[name], filter_mask(image)), name
+
+
+def test_renders_match_physics_render(render_env):
+    for _ in range(2):
+        assert_renders_match(render_env, render_env.reset())
+        for _ in range(3):
+            time_step = render_env.step(np.array([1.0, 0.5]))
+            assert_renders_match(render_env, time_step)
+
+
+def test_pixels_are_not_overwritten_by_later_steps(render_env):
+    render_env.reset()
+    frames, expected = [], []
+    for _ in range(3):
+        time_step = render_env.step(np.array([1.0, 0.5]))
+        frames.append(time_step.observation["pixels"])
+        expected.append(frames[-1].copy())
+    for frame, frame_copy in zip(frames, expected):
+        assert np.array_equal(frame, frame_copy)
+
+
+def test_guidewire_mask_follows_state_edits(render_env):
+    render_env.reset()
+    for _ in range(5):
+        render_env.step(np.array([1.0, 0.5]))
+    physics, task = render_env.physics, render_env.task
+    before = task.get_guidewire_mask(physics)
+
+    physics.data.qpos[:] = 0
+    physics.forward()
+    after = task.get_guidewire_mask(physics)
+    image = physics.render(80, 80, camera_id=0, scene_option=GUIDEWIRE_SCENE_OPTION)
+    assert np.array_equal(after, filter_mask(image))
+    assert not np.array_equal(after, before)
+
+
+def test_masks_are_fresh_arrays(render_env):
+    render_env.reset()
+    physics, task = render_env.physics, render_env.task
+    masks = []
+    for _ in range(3):
+        render_env.step(np.array([1.0, 0.5]))
+        masks.append(task.get_guidewire_mask(physics))
+    assert masks[0] is not masks[1]
+    assert not np.shares_memory(masks[0], masks[1])
+    assert not np.array_equal(masks[0], masks[-1])